@@ -0,0 +1,432 @@
+# Load generator that drives the MCP servers over stdio and records latency baselines
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+import fitz
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from fake_gemini import start_fake_gemini
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERS_DIR = os.path.join(REPO_ROOT, "servers")
+
+# Servers we know how to drive. mcp_spawner.py is excluded by default because
+# spawn_mcp_function rewrites its own source and scrape_data_selenium needs Chrome.
+SERVERS = [
+    "server.py",
+    "server_new.py",
+    "image_server.py",
+    "multiprimitive_server.py",
+    "multitool_server.py",
+    "mcp_spawner.py",
+]
+DEFAULT_SERVERS = [s for s in SERVERS if s != "mcp_spawner.py"]
+
+# Relative weight of each operation in the call mix. Operations a server
+# does not expose are simply left out of its mix.
+DEFAULT_MIX = {
+    "read_csv": 3,
+    "read_document": 3,
+    "read_pdf": 3,
+    "read_image": 1,
+    "fetch_from_db": 3,
+    "users_resource": 3,
+    "list_files_in_directory": 1,
+    "add": 1,
+    "create_file": 1,
+}
+
+
+def generate_csv(path: str, rows: int):
+    """Writes a CSV with `rows` data rows and a handful of typed columns."""
+    rng = random.Random(0)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "city", "score", "active"])
+        cities = ["Kochi", "Chennai", "Pune", "Delhi", "Mumbai", "Bangalore"]
+        for i in range(1, rows + 1):
+            writer.writerow([i, f"user_{i}", rng.choice(cities), round(rng.random() * 100, 2), i % 2 == 0])
+
+
+def generate_pdf(path: str, pages: int):
+    """Writes a PDF with `pages` pages of filler text."""
+    doc = fitz.open()
+    for n in range(1, pages + 1):
+        page = doc.new_page()
+        lines = [f"Page {n}, line {i}: the quick brown fox jumps over the lazy dog." for i in range(1, 41)]
+        page.insert_text((72, 72), "\n".join(lines), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def generate_users(path: str, count: int):
+    """Writes a users.json in the same shape as data/users.json."""
+    users = [{"user_id": i, "name": f"User {i}"} for i in range(1, count + 1)]
+    with open(path, "w") as f:
+        json.dump(users, f)
+
+
+def generate_image(path: str):
+    """Writes a small solid-colour PNG for read_image."""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), False)
+    pix.clear_with(180)
+    pix.save(path)
+
+
+def prepare_data(data_dir: str, csv_rows: int, pdf_pages: int, users: int) -> dict:
+    """
+    Generates the benchmark inputs into `data_dir`, reusing files that
+    already exist with the requested size.
+
+    Returns:
+        dict: Paths and sizes the workload generators need.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    data = {
+        "dir": data_dir,
+        "csv": os.path.join(data_dir, f"rows_{csv_rows}.csv"),
+        "pdf": os.path.join(data_dir, f"pages_{pdf_pages}.pdf"),
+        "users": os.path.join(data_dir, "users.json"),
+        "image": os.path.join(data_dir, "image.png"),
+        "scratch": os.path.join(data_dir, "scratch"),
+        "csv_rows": csv_rows,
+        "pdf_pages": pdf_pages,
+        "user_count": users,
+    }
+
+    if not os.path.exists(data["csv"]):
+        print(f"Generating {csv_rows} row CSV...")
+        generate_csv(data["csv"], csv_rows)
+    if not os.path.exists(data["pdf"]):
+        print(f"Generating {pdf_pages} page PDF...")
+        generate_pdf(data["pdf"], pdf_pages)
+    # users.json is always rewritten since its size is not in the file name
+    generate_users(data["users"], users)
+    if not os.path.exists(data["image"]):
+        generate_image(data["image"])
+    os.makedirs(data["scratch"], exist_ok=True)
+
+    return data
+
+
+def operation_args(op: str, data: dict, rng: random.Random):
+    """
+    Returns the tool arguments (or resource URI) for one call of `op`.
+    """
+    if op in ("read_csv", "read_document"):
+        return {"file_path": data["csv"], "nth_row": rng.randint(1, data["csv_rows"])}
+    if op == "read_pdf":
+        return {"file_path": data["pdf"], "page_number": rng.randint(1, data["pdf_pages"])}
+    if op == "read_image":
+        return {"image_path": data["image"], "query": "Describe this image."}
+    if op == "fetch_from_db":
+        return {"user_id": rng.randint(1, data["user_count"])}
+    if op == "users_resource":
+        return f"users://{rng.randint(1, data['user_count'])}/profile"
+    if op == "list_files_in_directory":
+        return {"directory_path": data["dir"]}
+    if op == "add":
+        return {"a": rng.randint(0, 1000), "b": rng.randint(0, 1000)}
+    if op == "create_file":
+        return {"file_path": os.path.join(data["scratch"], f"{rng.getrandbits(32)}.txt"), "content": "benchmark"}
+    raise ValueError(f"No argument generator for operation '{op}'")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """
+    Turns the latencies (seconds) of successful calls into throughput and
+    tail latency in ms. Failed calls only count towards the error rate.
+    """
+    values = sorted(latencies)
+    calls = len(values) + errors
+    return {
+        "calls": calls,
+        "ok": len(values),
+        "errors": errors,
+        "error_rate": errors / calls if calls else 0.0,
+        "throughput": len(values) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": (sum(values) / len(values) * 1000) if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] * 1000) if values else 0.0,
+    }
+
+
+async def available_operations(session: ClientSession, mix: dict) -> list:
+    """Intersects the requested mix with what the server actually exposes."""
+    tools = await session.list_tools()
+    names = {tool.name for tool in tools.tools}
+
+    try:
+        templates = await session.list_resource_templates()
+        if any(t.uriTemplate.startswith("users://") for t in templates.resourceTemplates):
+            names.add("users_resource")
+    except Exception:
+        pass
+
+    return [op for op, weight in mix.items() if weight > 0 and op in names]
+
+
+async def call_operation(session: ClientSession, op: str, args) -> bool:
+    """Performs one call and reports whether it succeeded."""
+    if op == "users_resource":
+        result = await session.read_resource(args)
+        return not any('"error"' in getattr(c, "text", "") for c in result.contents)
+
+    result = await session.call_tool(op, arguments=args)
+    if result.isError:
+        return False
+    text = result.content[0].text if result.content else ""
+    return not text.startswith("Error")
+
+
+def describe_failure(exc: BaseException) -> str:
+    """Unwraps the single-exception groups anyio nests client errors in."""
+    while len(getattr(exc, "exceptions", ())) == 1:
+        exc = exc.exceptions[0]
+    return repr(exc)
+
+
+async def worker(worker_id: int, server_params: StdioServerParameters, mix: dict, data: dict, deadline_after: float, warmup: float, startup_timeout: float, samples: dict, errors: dict, ready: asyncio.Event, start: asyncio.Event):
+    """
+    One concurrent client: spawns its own server process, then issues calls
+    from the weighted mix until the run ends. Calls during the warm-up
+    window are executed but not recorded. Successful calls are timed in
+    `samples`, failed ones counted in `errors`. If the session dies the
+    client stops and the exception propagates.
+
+    `ready` is set once the handshake is done or has failed, so a server
+    that cannot start never holds up the other clients.
+    """
+    rng = random.Random(worker_id)
+
+    try:
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(server_params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await asyncio.wait_for(session.initialize(), startup_timeout)
+                    ops = await available_operations(session, mix)
+                    ready.set()
+                    await start.wait()
+
+                    if not ops:
+                        return
+                    weights = [mix[op] for op in ops]
+
+                    begin = time.perf_counter()
+                    record_from = begin + warmup
+                    stop_at = begin + deadline_after
+
+                    while time.perf_counter() < stop_at:
+                        op = rng.choices(ops, weights)[0]
+                        args = operation_args(op, data, rng)
+                        t0 = time.perf_counter()
+                        try:
+                            ok = await call_operation(session, op, args)
+                        except McpError as e:
+                            # The server went away: stop this client rather than
+                            # spinning on instant failures until the deadline
+                            if e.error.code == CONNECTION_CLOSED:
+                                raise
+                            ok = False
+                        t1 = time.perf_counter()
+
+                        if t0 < record_from:
+                            continue
+                        if ok:
+                            samples.setdefault(op, []).append(t1 - t0)
+                        else:
+                            errors[op] = errors.get(op, 0) + 1
+    finally:
+        ready.set()
+
+
+async def bench_server(server_file: str, concurrency: int, duration: float, warmup: float, startup_timeout: float, mix: dict, data: dict, env: dict) -> dict:
+    """
+    Runs `concurrency` clients against one server for `duration` seconds
+    (plus warm-up) and returns overall and per-tool statistics. Clients
+    that fail are reported in "client_failures" and counted as errors.
+    """
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(SERVERS_DIR, server_file)],
+        env=env,
+        # Servers open users.json relative to their working directory
+        cwd=data["dir"],
+    )
+
+    samples, errors = {}, {}
+    start = asyncio.Event()
+    ready_events = [asyncio.Event() for _ in range(concurrency)]
+    tasks = [
+        asyncio.create_task(worker(i, server_params, mix, data, warmup + duration, warmup, startup_timeout, samples, errors, ready_events[i], start))
+        for i in range(concurrency)
+    ]
+
+    # Only start the clock once every server process has finished (or failed) its handshake
+    await asyncio.gather(*(e.wait() for e in ready_events))
+    start.set()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # A client whose server failed to start or died counts as an error for this server
+    failures = [describe_failure(o) for o in outcomes if isinstance(o, BaseException)]
+    for failure in failures:
+        print(f"  {server_file}: client failed: {failure}")
+
+    all_latencies = [v for values in samples.values() for v in values]
+    return {
+        "overall": summarize(all_latencies, sum(errors.values()) + len(failures), duration),
+        "tools": {op: summarize(samples.get(op, []), errors.get(op, 0), duration) for op in sorted(set(samples) | set(errors))},
+        "client_failures": failures,
+    }
+
+
+def print_report(results: dict):
+    header = f"{'server':<26}{'operation':<26}{'ok':>8}{'err':>6}{'err %':>7}{'ops/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for server, stats in results.items():
+        rows = [("ALL", stats["overall"])] + list(stats["tools"].items())
+        for op, s in rows:
+            print(f"{server:<26}{op:<26}{s['ok']:>8}{s['errors']:>6}{s['error_rate'] * 100:>7.1f}{s['throughput']:>10.1f}{s['p50_ms']:>10.1f}{s['p90_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+
+
+def compare(baseline: dict, current: dict, tolerance: float, error_tolerance: float) -> list:
+    """
+    Compares two result sets and lists regressions: throughput falling or
+    p99 latency rising by more than `tolerance` (a fraction, e.g. 0.1), the
+    error rate rising by more than `error_tolerance` (an absolute fraction),
+    or an operation from the baseline no longer being exercised.
+    """
+    regressions = []
+    for server, stats in current["servers"].items():
+        base_server = baseline.get("servers", {}).get(server)
+        if not base_server:
+            continue
+        rows = [("ALL", stats["overall"], base_server["overall"])]
+        for op, before in base_server["tools"].items():
+            if op in stats["tools"]:
+                rows.append((op, stats["tools"][op], before))
+            else:
+                regressions.append(f"{server} {op}: no calls recorded (baseline had {before.get('ok', before['calls'])})")
+        for op, now, before in rows:
+            before_rate = before.get("error_rate", 0.0)
+            if now["error_rate"] > before_rate + error_tolerance:
+                regressions.append(f"{server} {op}: error rate {before_rate * 100:.1f}% -> {now['error_rate'] * 100:.1f}%")
+            if before["throughput"] and now["throughput"] < before["throughput"] * (1 - tolerance):
+                regressions.append(f"{server} {op}: throughput {before['throughput']:.1f} -> {now['throughput']:.1f} ops/s")
+            if before["p99_ms"] and now["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{server} {op}: p99 {before['p99_ms']:.1f} -> {now['p99_ms']:.1f} ms")
+    return regressions
+
+
+def parse_mix(value: str) -> dict:
+    """Parses "read_csv=5,read_pdf=2" into a weight dict layered over the default mix."""
+    mix = dict(DEFAULT_MIX)
+    if value:
+        for item in value.split(","):
+            name, _, weight = item.partition("=")
+            mix[name.strip()] = float(weight)
+    return mix
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP servers over stdio.")
+    parser.add_argument("--servers", nargs="+", default=DEFAULT_SERVERS, choices=SERVERS, help="Server files to benchmark.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients (one server process each).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per server.")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before recording.")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds allowed for each server's handshake.")
+    parser.add_argument("--mix", default="", help='Operation weights, e.g. "read_csv=5,read_pdf=2,read_image=0".')
+    parser.add_argument("--csv-rows", type=int, default=1_000_000)
+    parser.add_argument("--pdf-pages", type=int, default=300)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Simulated model latency for read_image, in seconds.")
+    parser.add_argument("--data-dir", default=os.path.join(REPO_ROOT, "benchmarks", ".data"))
+    parser.add_argument("--save", help="Write results as a JSON baseline to this path.")
+    parser.add_argument("--compare", help="Compare against a saved JSON baseline; exits 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression when comparing.")
+    parser.add_argument("--error-tolerance", type=float, default=0.0, help="Allowed absolute rise in error rate when comparing (0.01 = 1 point).")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VAL", help="Extra environment for the servers, e.g. MCP_WARM_DIRS=/data. Repeatable.")
+    args = parser.parse_args()
+
+    data = prepare_data(args.data_dir, args.csv_rows, args.pdf_pages, args.users)
+    mix = parse_mix(args.mix)
+
+    gemini = start_fake_gemini(latency=args.gemini_latency)
+    # The SDK only forwards a few variables by default, so pass ours on explicitly
+    # to let settings like MCP_WARM_DIRS and MCP_RESULT_PAGE_BYTES reach the servers
+    env = {**os.environ, **dict(item.split("=", 1) for item in args.env), "GEMINI_BASE_URL": f"http://127.0.0.1:{gemini.server_address[1]}"}
+
+    results = {}
+    try:
+        for server_file in args.servers:
+            print(f"Benchmarking {server_file} with {args.concurrency} clients for {args.duration}s...")
+            results[server_file] = await bench_server(server_file, args.concurrency, args.duration, args.warmup, args.startup_timeout, mix, data, env)
+    finally:
+        gemini.shutdown()
+
+    print()
+    print_report(results)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": mix,
+            "csv_rows": args.csv_rows,
+            "pdf_pages": args.pdf_pages,
+            "users": args.users,
+            "gemini_latency": args.gemini_latency,
+            "env": args.env,
+        },
+        "servers": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance, args.error_tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+# To run the benchmarks:
+# python benchmarks/bench.py --concurrency 8 --duration 30 --save baseline.json
+
+if __name__ == "__main__":
+    asyncio.run(main())
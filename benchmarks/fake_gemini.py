@@ -0,0 +1,127 @@
+# A local stand-in for the Gemini REST API so benchmarks never hit the real model
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def default_script(reply_text: str) -> list:
+    """
+    The stream sent when no script is given: the reply text, one word per chunk.
+    """
+    words = reply_text.split(" ")
+    return [{"parts": [{"text": word + (" " if i < len(words) - 1 else "")}]} for i, word in enumerate(words)]
+
+
+def make_handler(reply_text: str, latency: float, script: list = None, chunk_delay: float = 0.0):
+    """
+    Builds a request handler class that answers generateContent calls with
+    the same canned text after sleeping for `latency` seconds, and
+    streamGenerateContent calls with the chunks in `script`.
+
+    Each script chunk is {"parts": [...]} in the REST API's part format, e.g.
+    {"text": "..."} or {"functionCall": {"name": "add", "args": {...}}}, with
+    an optional "delay" in seconds overriding `chunk_delay`.
+    """
+    script = script or default_script(reply_text)
+
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            # Drain the request body (the image bytes) like the real API would
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+
+            if ":streamGenerateContent" in self.path:
+                self.stream()
+            elif ":generateContent" in self.path:
+                self.respond()
+            else:
+                self.send_error(404, f"Unsupported endpoint: {self.path}")
+
+        def respond(self):
+            time.sleep(latency)
+
+            body = json.dumps({
+                "candidates": [
+                    {
+                        "content": {"role": "model", "parts": [{"text": reply_text}]},
+                        "finishReason": "STOP",
+                    }
+                ]
+            }).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            # Server-sent events, as requested by the SDK with ?alt=sse
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+
+            for i, chunk in enumerate(script):
+                if i > 0:
+                    time.sleep(chunk.get("delay", chunk_delay))
+                candidate = {"content": {"role": "model", "parts": chunk["parts"]}}
+                if i == len(script) - 1:
+                    candidate["finishReason"] = "STOP"
+                event = json.dumps({"candidates": [candidate]})
+                self.wfile.write(f"data: {event}\r\n\r\n".encode())
+                self.wfile.flush()
+
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            # Keep benchmark output readable
+            pass
+
+    return FakeGeminiHandler
+
+
+def start_fake_gemini(host: str = "127.0.0.1", port: int = 0, reply_text: str = "A synthetic test image.", latency: float = 0.0, script: list = None, chunk_delay: float = 0.0):
+    """
+    Starts the fake Gemini server on a background thread.
+
+    Args:
+        host (str): Interface to bind to.
+        port (int): Port to bind to. 0 picks a free port.
+        reply_text (str): Text returned for every request.
+        latency (float): Seconds to wait before answering, to mimic model time.
+        script (list, optional): Chunks to send for streaming requests.
+        chunk_delay (float): Seconds between streamed chunks.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Its base URL is
+        f"http://{host}:{server.server_address[1]}". Call shutdown() when done.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(reply_text, latency, script, chunk_delay))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Gemini endpoint.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated model latency.")
+    parser.add_argument("--script", help="JSON file with the list of chunks to stream.")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks.")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as f:
+            script = json.load(f)
+
+    server = start_fake_gemini(port=args.port, latency=args.latency, script=script, chunk_delay=args.chunk_delay)
+    print(f"Fake Gemini listening on http://127.0.0.1:{args.port} (set GEMINI_BASE_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
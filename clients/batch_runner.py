@@ -0,0 +1,347 @@
+# Offline batch executor: runs tool calls from a JSONL file without an LLM in the loop
+#
+# Each input line is a JSON object like:
+#   {"server": "server_new.py", "tool": "add", "arguments": {"a": 1, "b": 2}}
+#
+# Every server gets a small pool of long-lived stdio sessions, so the cost of
+# spawning a server process is paid once per pool slot instead of once per call.
+# The output JSONL doubles as the checkpoint: rerunning with the same output
+# file skips every input line that already has a result. Calls that never got
+# an answer because their server could not start or died are written with
+# "retryable": true and are run again on the next resume.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import timedelta
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+SERVERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers")
+
+# Placed on a server's queue to tell its pooled sessions to shut down
+STOP = None
+
+
+def describe_failure(exc: BaseException) -> str:
+    """Unwraps the single-exception groups anyio nests client errors in."""
+    while len(getattr(exc, "exceptions", ())) == 1:
+        exc = exc.exceptions[0]
+    return repr(exc)
+
+
+def resolve_server(server: str) -> str:
+    """
+    Maps a record's "server" field to a script path. Bare names such as
+    "server.py" are looked up in the servers directory.
+    """
+    if os.path.exists(server):
+        return os.path.abspath(server)
+    candidate = os.path.join(SERVERS_DIR, server)
+    if os.path.exists(candidate):
+        return candidate
+    raise FileNotFoundError(f"Server script not found: {server}")
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    Reads the indices already present in the output file. A partially
+    written last line (from a crash mid-write) is cut off so appending
+    resumes on a clean line boundary, and retryable failures are removed
+    so those calls run again and each index keeps a single result.
+
+    Returns:
+        set: Input line indices that already have results.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    good_bytes = 0
+    retryable = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+                index = record["index"]
+            except (ValueError, KeyError, TypeError):
+                break
+            if record.get("retryable"):
+                retryable += 1
+            else:
+                done.add(index)
+            good_bytes += len(line)
+
+    if retryable:
+        # Rewrite without the retryable records, then swap the file in atomically
+        tmp_path = output_path + ".tmp"
+        with open(output_path, "rb") as src, open(tmp_path, "wb") as dst:
+            remaining = good_bytes
+            for line in src:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                if not json.loads(line).get("retryable"):
+                    dst.write(line)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, output_path)
+    elif good_bytes != os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(good_bytes)
+
+    return done
+
+
+class ServerPool:
+    """
+    A fixed number of sessions to one server, each owned by its own task.
+    Sessions pull jobs from a shared queue, so a slow call only ties up
+    one slot. A session that breaks is restarted for the next job, until
+    `max_startup_failures` starts in a row have failed; after that the
+    pool stops spawning and fails its remaining jobs as retryable.
+    """
+
+    def __init__(self, script_path: str, size: int, cwd: str, call_timeout: float, on_result,
+                 startup_timeout: float = 30.0, max_startup_failures: int = 3):
+        self.params = StdioServerParameters(
+            command=sys.executable,
+            args=[script_path],
+            cwd=cwd,
+            # The SDK only passes a few safe variables (HOME, PATH, ...) by default
+            env=dict(os.environ),
+        )
+        self.size = size
+        self.call_timeout = timedelta(seconds=call_timeout) if call_timeout else None
+        self.on_result = on_result
+        self.startup_timeout = startup_timeout
+        self.max_startup_failures = max_startup_failures
+        self.startup_failures = 0
+        self.last_failure = None
+        self.jobs = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._slot()) for _ in range(size)]
+
+    async def _slot(self):
+        job = await self.jobs.get()
+        while job is not STOP:
+            if self.startup_failures >= self.max_startup_failures:
+                # The server keeps failing to start; don't spawn one per job
+                self.on_result(job, None, f"Server unavailable: {self.last_failure}", 0.0, retryable=True)
+                job = await self.jobs.get()
+                continue
+
+            started = False
+            try:
+                with open(os.devnull, "w") as devnull:
+                    async with stdio_client(self.params, errlog=devnull) as (read, write):
+                        async with ClientSession(read, write) as session:
+                            await asyncio.wait_for(session.initialize(), self.startup_timeout)
+                            started = True
+                            self.startup_failures = 0
+                            while job is not STOP:
+                                await self._run(session, job)
+                                job = await self.jobs.get()
+            except Exception as e:
+                if job is STOP:
+                    return
+                if not started:
+                    self.startup_failures += 1
+                self.last_failure = describe_failure(e)
+                # The session died. Fail the job it was holding as retryable, so
+                # a resume runs it again, then start a fresh server for the next one.
+                self.on_result(job, None, f"Session failed: {self.last_failure}", 0.0, retryable=True)
+                job = await self.jobs.get()
+
+    async def _run(self, session: ClientSession, job: dict):
+        start = time.perf_counter()
+        try:
+            result = await session.call_tool(job["tool"], arguments=job.get("arguments") or {}, read_timeout_seconds=self.call_timeout)
+        except McpError as e:
+            if e.error.code == CONNECTION_CLOSED:
+                raise
+            # Other protocol-level errors (unknown tool, timeout) leave the session usable
+            self.on_result(job, None, str(e), time.perf_counter() - start)
+            return
+        self.on_result(job, result, None, time.perf_counter() - start)
+
+    async def close(self):
+        for _ in range(self.size):
+            await self.jobs.put(STOP)
+        await asyncio.gather(*self.tasks)
+
+
+class BatchRunner:
+    """
+    Streams records from the input file, dispatches them to per-server
+    pools and writes results to the output file, either in input order or
+    as they complete.
+    """
+
+    def __init__(self, output_path: str, pool_size: int, window: int, ordered: bool, cwd: str, call_timeout: float, fsync_every: int,
+                 startup_timeout: float = 30.0, max_startup_failures: int = 3):
+        self.output_path = output_path
+        self.pool_size = pool_size
+        self.ordered = ordered
+        self.cwd = cwd
+        self.call_timeout = call_timeout
+        self.fsync_every = fsync_every
+        self.startup_timeout = startup_timeout
+        self.max_startup_failures = max_startup_failures
+
+        self.pools = {}
+        # Caps records that are dispatched but not yet written, which bounds
+        # both in-flight calls and the reorder buffer in ordered mode
+        self.window = asyncio.Semaphore(window)
+        self.pending_order = deque()
+        self.finished = {}
+        self.out = None
+        self.written = 0
+        self.failed = 0
+        self.retryable = 0
+
+    def _pool_for(self, server: str) -> ServerPool:
+        script_path = resolve_server(server)
+        if script_path not in self.pools:
+            self.pools[script_path] = ServerPool(
+                script_path, self.pool_size, self.cwd, self.call_timeout, self._on_result,
+                startup_timeout=self.startup_timeout, max_startup_failures=self.max_startup_failures,
+            )
+        return self.pools[script_path]
+
+    def _on_result(self, job: dict, result, error, elapsed: float, retryable: bool = False):
+        record = {
+            "index": job["index"],
+            "server": job.get("server"),
+            "tool": job.get("tool"),
+            "ok": error is None and not result.isError,
+            "elapsed_ms": round(elapsed * 1000, 3),
+        }
+        if result is not None:
+            record["result"] = result.model_dump(mode="json", exclude_none=True)
+        if error is not None:
+            record["error"] = error
+        if retryable:
+            record["retryable"] = True
+
+        if self.ordered:
+            self.finished[job["index"]] = record
+            while self.pending_order and self.pending_order[0] in self.finished:
+                self._write(self.finished.pop(self.pending_order.popleft()))
+        else:
+            self._write(record)
+
+    def _write(self, record: dict):
+        self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+        self.written += 1
+        if not record["ok"]:
+            self.failed += 1
+        if record.get("retryable"):
+            self.retryable += 1
+        if self.fsync_every and self.written % self.fsync_every == 0:
+            os.fsync(self.out.fileno())
+        self.window.release()
+
+    def _fail_now(self, index: int, error: str):
+        """Records a failure for a line that never reached a server."""
+        if self.ordered:
+            self.pending_order.append(index)
+        self._on_result({"index": index}, None, error, 0.0)
+
+    async def run(self, input_path: str, limit: int = None) -> dict:
+        done = load_checkpoint(self.output_path)
+        skipped = 0
+        start = time.perf_counter()
+
+        with open(self.output_path, "a") as self.out, open(input_path, "r") as source:
+            for index, line in enumerate(source):
+                if limit is not None and index >= limit:
+                    break
+                if index in done:
+                    skipped += 1
+                    continue
+                if not line.strip():
+                    continue
+
+                await self.window.acquire()
+
+                try:
+                    record = json.loads(line)
+                    pool = self._pool_for(record["server"])
+                    if "tool" not in record:
+                        raise KeyError("tool")
+                except (ValueError, KeyError, TypeError, FileNotFoundError) as e:
+                    self._fail_now(index, f"Invalid record: {e!r}")
+                    continue
+
+                job = {**record, "index": index}
+                if self.ordered:
+                    self.pending_order.append(index)
+                await pool.jobs.put(job)
+
+            for pool in self.pools.values():
+                await pool.close()
+
+            self.out.flush()
+            os.fsync(self.out.fileno())
+
+        return {
+            "written": self.written,
+            "failed": self.failed,
+            "retryable": self.retryable,
+            "skipped": skipped,
+            "seconds": time.perf_counter() - start,
+        }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run MCP tool calls in bulk from a JSONL file.")
+    parser.add_argument("input", help='JSONL of {"server", "tool", "arguments"} records.')
+    parser.add_argument("output", help="Results JSONL. Also the checkpoint: rerun with the same path to resume.")
+    parser.add_argument("--pool-size", type=int, default=4, help="Sessions (server processes) per server.")
+    parser.add_argument("--window", type=int, default=64, help="Max records dispatched but not yet written.")
+    parser.add_argument("--as-completed", action="store_true", help="Write results as they finish instead of in input order.")
+    parser.add_argument("--cwd", default=os.getcwd(), help="Working directory for server processes (e.g. where users.json lives).")
+    parser.add_argument("--timeout", type=float, default=0, help="Per-call timeout in seconds (0 = none).")
+    parser.add_argument("--startup-timeout", type=float, default=30.0, help="Seconds to wait for a server to initialize.")
+    parser.add_argument("--max-startup-failures", type=int, default=3,
+                        help="Stop spawning a server after this many failed starts in a row and fail its remaining calls as retryable.")
+    parser.add_argument("--fsync-every", type=int, default=100, help="fsync the output every N records.")
+    parser.add_argument("--limit", type=int, help="Only process the first N input lines.")
+    parser.add_argument("--restart", action="store_true", help="Discard an existing output file instead of resuming.")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+
+    runner = BatchRunner(
+        output_path=args.output,
+        pool_size=args.pool_size,
+        window=args.window,
+        ordered=not args.as_completed,
+        cwd=args.cwd,
+        call_timeout=args.timeout,
+        fsync_every=args.fsync_every,
+        startup_timeout=args.startup_timeout,
+        max_startup_failures=args.max_startup_failures,
+    )
+    stats = await runner.run(args.input, limit=args.limit)
+
+    rate = stats["written"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"Wrote {stats['written']} results ({stats['failed']} failed, {stats['retryable']} retryable on resume), "
+          f"skipped {stats['skipped']} already done, in {stats['seconds']:.1f}s ({rate:.1f} calls/s)")
+
+
+# To run a batch:
+# python clients/batch_runner.py calls.jsonl results.jsonl --pool-size 4
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -12,14 +12,24 @@ from mcp import StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 import asyncio
+import os
+import sys
 
-# Connect Google GenAI client
-client = genai.Client(api_key="")
+# run_streaming_turn: Streams Gemini's response and dispatches tool calls as they arrive.
+from streaming import run_streaming_turn, print_metrics
+
+# Connect Google GenAI client (GEMINI_BASE_URL can point it at a local scripted stream)
+client = genai.Client(
+    api_key="",
+    http_options=types.HttpOptions(base_url=os.environ.get("GEMINI_BASE_URL")),
+)
 
 # Launch and communicate with MCP server using stdio
+# The server file can be passed on the command line and is looked up in the servers directory
+server_file = sys.argv[1] if len(sys.argv) > 1 else "multiprimitive_server.py"
 server_params = StdioServerParameters(
     command="python",
-    args=["multiprimitive_server.py"],
+    args=[os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "servers", server_file)],
 )
 
 async def run():
@@ -55,22 +65,17 @@ async def run():
             ]
             config = types.GenerateContentConfig(tools=tools)
             
-            # Get response from Gemini
-            response = client.models.generate_content(
+            # Stream the response from Gemini: text is printed as it arrives and
+            # each tool call is sent to the MCP server as soon as its part is received
+            _, metrics = await run_streaming_turn(
+                client,
+                session,
                 model="gemini-2.5-pro-preview-03-25",
                 contents=prompt,
                 config=config,
             )
 
-            tool_call = response.candidates[0].content.parts[0].function_call
-
-            # Use MCP client to call the tool and get result
-            tool_name = tool_call.name
-            tool_args = tool_call.args
-
-            result = await session.call_tool(tool_name, arguments=tool_args)
-
-            print("Tool Result:", result.content[0].text)
+            print_metrics(metrics)
 
 if __name__ == "__main__":
     asyncio.run(run())
\ No newline at end of file
@@ -0,0 +1,99 @@
+# Streaming agent turn shared by the clients
+#
+# Instead of waiting for Gemini's full response, we consume it as a stream:
+# text is printed as soon as it arrives and every function call is sent to
+# the MCP server the moment its part shows up, while the rest of the
+# response is still being generated.
+import asyncio
+import time
+
+
+async def run_streaming_turn(client, session, model, contents, config):
+    """
+    Streams one model response and dispatches its tool calls early.
+
+    Args:
+        client (genai.Client): The Google GenAI client.
+        session (ClientSession): An initialized MCP session.
+        model (str): The Gemini model name.
+        contents: The prompt or conversation to send.
+        config (types.GenerateContentConfig): Config with the MCP tools.
+
+    Returns:
+        tuple: (results, metrics) where results is a list of
+               (tool_name, CallToolResult or the exception the call raised)
+               in the order the calls arrived, and metrics holds
+               time_to_first_token (first chunk with any part, text or
+               function call), time_to_first_tool_call,
+               time_to_first_tool_result, time_to_stream_end and total in
+               seconds (None if the event never happened).
+    """
+    start = time.perf_counter()
+    metrics = {
+        "time_to_first_token": None,
+        "time_to_first_tool_call": None,
+        "time_to_first_tool_result": None,
+        "time_to_stream_end": None,
+        "total": None,
+    }
+    tool_tasks = []
+
+    async def call_tool(tool_name, tool_args):
+        try:
+            result = await session.call_tool(tool_name, arguments=tool_args)
+        except Exception as e:
+            # Report the failed call and let the other calls and the stream carry on
+            print(f"\nTool Error ({tool_name}):", e)
+            return tool_name, e
+        if metrics["time_to_first_tool_result"] is None:
+            metrics["time_to_first_tool_result"] = time.perf_counter() - start
+        text = result.content[0].text if result.content else ""
+        print(f"\nTool Result ({tool_name}):", text)
+        return tool_name, result
+
+    try:
+        stream = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=config,
+        )
+
+        async for chunk in stream:
+            if not chunk.candidates or not chunk.candidates[0].content:
+                continue
+
+            parts = chunk.candidates[0].content.parts or []
+            # The first token is the first content of any kind, text or a function call
+            if parts and metrics["time_to_first_token"] is None:
+                metrics["time_to_first_token"] = time.perf_counter() - start
+
+            for part in parts:
+                if part.text:
+                    print(part.text, end="", flush=True)
+
+                if part.function_call:
+                    if metrics["time_to_first_tool_call"] is None:
+                        metrics["time_to_first_tool_call"] = time.perf_counter() - start
+                    # Use MCP client to call the tool without waiting for the stream to finish
+                    tool_call = part.function_call
+                    tool_tasks.append(asyncio.create_task(call_tool(tool_call.name, tool_call.args)))
+
+        metrics["time_to_stream_end"] = time.perf_counter() - start
+    except BaseException:
+        # Don't leave tool calls running if the stream fails or is cancelled
+        for task in tool_tasks:
+            task.cancel()
+        await asyncio.gather(*tool_tasks, return_exceptions=True)
+        raise
+
+    results = await asyncio.gather(*tool_tasks, return_exceptions=True)
+    metrics["total"] = time.perf_counter() - start
+    return results, metrics
+
+
+def print_metrics(metrics: dict):
+    """Prints the latency metrics from run_streaming_turn in milliseconds."""
+    print()
+    for name, value in metrics.items():
+        label = name.replace("_", " ").capitalize()
+        print(f"{label}: {value * 1000:.1f} ms" if value is not None else f"{label}: n/a")
@@ -1,11 +1,14 @@
 # server.py
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 import os
 from google import genai
 from google.genai import types
 import re
+import asyncio
+from paging import paginate, register_next_page
 
 mcp = FastMCP("MCPSpawner")
+register_next_page(mcp)
 
 SYSTEM_PROMPT = """
 You are given a query to create a new python function based on the provided input.
@@ -59,21 +62,26 @@ def spawn_mcp_function(query: str) -> str:
     return generated_code
 
 
-@mcp.tool()
-def scrape_data_selenium(url: str) -> dict:
+@mcp.tool(structured_output=False)
+async def scrape_data_selenium(url: str, ctx: Context) -> str:
     """
     Scrapes data from a given URL using Selenium WebDriver.
 
     This function initializes a Chrome WebDriver (in headless mode for efficiency),
     navigates to the specified URL, and extracts the page title and the
-    text content of the body. It then closes the browser.
+    text content of the body. It then closes the browser. Progress is reported
+    after each step, and results larger than MCP_RESULT_PAGE_BYTES are split
+    into pages fetched with next_page.
 
     Args:
         url (str): The URL to scrape data from.
 
     Returns:
-        dict: A dictionary containing the 'title' and 'body_text' of the page.
-              Returns an empty dictionary if an error occurs during scraping.
+        str: A page envelope (JSON with "page", "page_number", "total_pages"
+             and "next_cursor") whose page is an object containing the
+             'title' and 'body_text' of the page, or the first chunk of its
+             JSON text when the result is large. The object contains an
+             'error' key if scraping fails.
     """
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
@@ -91,23 +99,31 @@ def scrape_data_selenium(url: str) -> dict:
         chrome_options.add_argument("--disable-dev-shm-usage")  # Overcome limited resource problems
         chrome_options.add_argument("--disable-gpu") # Applicable for Windows OS and sometimes Linux
 
+        # Selenium calls block, so run them in a worker thread to keep the
+        # server responsive while progress notifications go out
+        await ctx.report_progress(0, 3, "Starting browser")
+
         # Initialize the Chrome WebDriver
         # Ensure you have the appropriate WebDriver executable (e.g., chromedriver)
         # in your system's PATH or specify its path directly.
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = await asyncio.to_thread(webdriver.Chrome, options=chrome_options)
+        await ctx.report_progress(1, 3, f"Loading {url}")
 
         # Navigate to the URL
-        driver.get(url)
+        await asyncio.to_thread(driver.get, url)
+        await ctx.report_progress(2, 3, "Extracting page text")
 
         # Scrape data
         scraped_data['title'] = driver.title
 
         try:
-            body_element = driver.find_element(By.TAG_NAME, 'body')
-            scraped_data['body_text'] = body_element.text
+            body_element = await asyncio.to_thread(driver.find_element, By.TAG_NAME, 'body')
+            scraped_data['body_text'] = await asyncio.to_thread(lambda: body_element.text)
         except NoSuchElementException:
             scraped_data['body_text'] = "Body element not found."
 
+        await ctx.report_progress(3, 3, "Done")
+
     except WebDriverException as e:
         print(f"Selenium WebDriver error: {e}")
         # Return an empty dict or specific error info if scraping fails
@@ -118,9 +134,9 @@ def scrape_data_selenium(url: str) -> dict:
     finally:
         # Always quit the driver to release resources
         if driver:
-            driver.quit()
+            await asyncio.to_thread(driver.quit)
 
-    return scraped_data
+    return paginate(scraped_data)
 
 
 @mcp.tool()
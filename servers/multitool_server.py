@@ -1,10 +1,12 @@
 # server.py
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 import pandas as pd
 import os
 import fitz
+from paging import paginate, register_next_page
 
 mcp = FastMCP("DocumentReader")
+register_next_page(mcp)
 
 @mcp.tool()
 def read_csv(file_path: str, nth_row: int) -> str:
@@ -45,29 +47,38 @@ def read_csv(file_path: str, nth_row: int) -> str:
     except Exception as e:
         return f"Error reading file: {e}"
     
-@mcp.tool()
-def list_files_in_directory(directory_path):
+@mcp.tool(structured_output=False)
+async def list_files_in_directory(directory_path: str, ctx: Context) -> str:
     """
     Lists all files (not directories) in the given directory path.
 
+    Progress is reported while the entries are checked, and listings larger
+    than MCP_RESULT_PAGE_BYTES are split into pages fetched with next_page.
+
     Args:
         directory_path (str): The path to the directory.
 
     Returns:
-        List[str]: A list of file names in the directory.
+        str: A page envelope (JSON with "page", "page_number", "total_pages"
+             and "next_cursor") holding the list of file names, or "[]" on error.
     """
     try:
         # List all entries in the directory
         entries = os.listdir(directory_path)
         # Filter out only files
-        files = [f for f in entries if os.path.isfile(os.path.join(directory_path, f))]
-        return files
+        files = []
+        for i, f in enumerate(entries, start=1):
+            if os.path.isfile(os.path.join(directory_path, f)):
+                files.append(f)
+            if i % 1000 == 0:
+                await ctx.report_progress(i, len(entries), f"Checked {i} of {len(entries)} entries")
+        return paginate(files)
     except FileNotFoundError:
         print(f"Error: Directory '{directory_path}' not found.")
-        return []
+        return "[]"
     except Exception as e:
         print(f"An error occurred: {e}")
-        return []
+        return "[]"
 
 # To run this server:
 # python server.py
@@ -0,0 +1,271 @@
+# Shared result paging for the servers in this directory
+#
+# Large tool results are split into pages of at most MCP_RESULT_PAGE_BYTES.
+# The first page is returned straight away together with an opaque cursor;
+# the remaining pages wait in a bounded, expiring in-memory store until the
+# client fetches them with the next_page tool.
+#
+# Paged tools return a single JSON text block (register them with
+# structured_output=False): on success always a page envelope with "page",
+# "page_number", "total_pages" and "next_cursor", even when the whole result
+# fits in one page, so clients only ever parse one shape. The limit applies
+# to that text as it appears on the wire, i.e. after JSON-escaping into the
+# JSON-RPC message.
+import base64
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+PAGE_BYTES = int(os.environ.get("MCP_RESULT_PAGE_BYTES", 64 * 1024))
+PAGE_TTL = float(os.environ.get("MCP_RESULT_PAGE_TTL", 300))
+MAX_STORED_RESULTS = int(os.environ.get("MCP_RESULT_MAX_STORED", 64))
+MAX_STORED_BYTES = int(os.environ.get("MCP_RESULT_MAX_STORED_BYTES", 64 * 1024 * 1024))
+
+# Longest cursor we could hand out: a 16 character result id and a large page index
+_LONGEST_CURSOR = base64.urlsafe_b64encode(f"{'x' * 16}:{10 ** 9}".encode()).decode()
+TRUNCATED_NOTE = "Result too large to keep for paging; the remaining pages were dropped."
+# Content bytes every page must have room for besides the envelope
+MIN_PAGE_CONTENT = 64
+
+
+def to_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def wire_size(text: str) -> int:
+    """Bytes `text` takes up as a JSON string inside the JSON-RPC message."""
+    return len(to_json(text).encode("utf-8"))
+
+
+def _envelope(page, page_number: int, total_pages: int, next_cursor, truncated: bool = False) -> str:
+    envelope = {
+        "page": page,
+        "page_number": page_number,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+    }
+    if truncated:
+        envelope["truncated"] = True
+        envelope["note"] = TRUNCATED_NOTE
+    return to_json(envelope)
+
+
+def _page_budget(empty_page, limit: int) -> int:
+    """Wire bytes left for the page content once the envelope is paid for."""
+    overhead = wire_size(_envelope(empty_page, 10 ** 9, 10 ** 9, _LONGEST_CURSOR, truncated=True))
+    return limit - overhead
+
+
+def min_page_bytes() -> int:
+    """Smallest page size that leaves MIN_PAGE_CONTENT bytes after the envelope."""
+    return MIN_PAGE_CONTENT - _page_budget("", 0)
+
+
+def check_page_bytes(limit: int, name: str = "limit") -> int:
+    """Raises ValueError if `limit` cannot hold the envelope plus some content."""
+    if limit < min_page_bytes():
+        raise ValueError(f"{name} must be at least {min_page_bytes()} bytes to fit the page envelope, got {limit}")
+    return limit
+
+
+def _content_size(page) -> int:
+    """Wire bytes a page's content adds to the envelope."""
+    return wire_size(to_json(page)) - 2  # minus the outer quotes of wire_size
+
+
+def split_text(text: str, budget: int) -> list:
+    """
+    Splits text into chunks whose escaped size inside the page envelope
+    stays within `budget` bytes. Chunks always make progress, so a single
+    oversized character still becomes its own chunk.
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        length = min(len(text) - start, budget)
+        while length > 1:
+            size = _content_size(text[start:start + length])
+            if size <= budget:
+                break
+            # Shrink in proportion to the overshoot, by at least one character
+            length = min(length - 1, length * budget // size)
+        chunks.append(text[start:start + max(length, 1)])
+        start += max(length, 1)
+    return chunks
+
+
+def split_list(items: list, budget: int):
+    """
+    Groups list items into pages whose escaped size inside the page
+    envelope stays within `budget` bytes.
+
+    Returns:
+        list | None: The pages, or None if a single item does not fit.
+    """
+    pages, current, size = [], [], 2  # 2 bytes for the enclosing []
+    for item in items:
+        item_size = _content_size(item) + 2  # separator ", "
+        if item_size + 2 > budget:
+            return None
+        if current and size + item_size > budget:
+            pages.append(current)
+            current, size = [], 2
+        current.append(item)
+        size += item_size
+    if current or not pages:
+        pages.append(current)
+    return pages
+
+
+class PageStore:
+    """
+    Holds the remaining pages of large results, keyed by result id.
+    Entries expire after `ttl` seconds, and the oldest entries are evicted
+    to make room once the store would hold more than `max_results` results
+    or `max_bytes` bytes of pages.
+    """
+
+    def __init__(self, ttl: float, max_results: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # result_id -> (expires_at, pages, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cursor(result_id: str, page_index: int) -> str:
+        return base64.urlsafe_b64encode(f"{result_id}:{page_index}".encode()).decode()
+
+    @staticmethod
+    def _parse_cursor(cursor: str):
+        result_id, page_index = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return result_id, int(page_index)
+
+    def _evict(self, now: float, extra_results: int = 0, extra_bytes: int = 0):
+        """Drops expired entries, then the oldest ones until the extra room fits."""
+        for result_id in [rid for rid, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._drop(result_id)
+        while self._entries and (
+            len(self._entries) + extra_results > self.max_results
+            or self._bytes + extra_bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, result_id: str):
+        _, _, size = self._entries.pop(result_id)
+        self._bytes -= size
+
+    def put(self, pages: list):
+        """
+        Stores all pages of a result and returns the cursor for page 2, or
+        None if the remaining pages are too big for the store at all.
+        """
+        size = sum(_content_size(page) for page in pages[1:])
+        if self.max_results < 1 or size > self.max_bytes:
+            return None
+
+        result_id = secrets.token_urlsafe(12)
+        with self._lock:
+            now = time.monotonic()
+            # Make room first, so the entry we are adding is never the one evicted
+            self._evict(now, extra_results=1, extra_bytes=size)
+            self._entries[result_id] = (now + self.ttl, pages, size)
+            self._bytes += size
+        return self._cursor(result_id, 1)
+
+    def get(self, cursor: str) -> str:
+        """
+        Returns the page a cursor points at, in the same JSON shape
+        paginate() produces, or a JSON object with an "error" key.
+        """
+        try:
+            result_id, page_index = self._parse_cursor(cursor)
+        except Exception:
+            return to_json({"error": f"Invalid cursor: {cursor}"})
+
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return to_json({"error": "Cursor expired or unknown. Re-run the original tool call."})
+            _, pages, size = entry
+            if not 0 < page_index < len(pages):
+                return to_json({"error": f"Invalid cursor: {cursor}"})
+
+            # Reading a page keeps the result alive for another TTL
+            self._entries[result_id] = (now + self.ttl, pages, size)
+            self._entries.move_to_end(result_id)
+            if page_index == len(pages) - 1:
+                self._drop(result_id)
+
+        next_cursor = self._cursor(result_id, page_index + 1) if page_index + 1 < len(pages) else None
+        return _envelope(pages[page_index], page_index + 1, len(pages), next_cursor)
+
+
+check_page_bytes(PAGE_BYTES, "MCP_RESULT_PAGE_BYTES")
+store = PageStore(PAGE_TTL, MAX_STORED_RESULTS, MAX_STORED_BYTES)
+
+
+def paginate(value, limit: int = None) -> str:
+    """
+    Returns a tool result as a page envelope of at most `limit` wire bytes:
+    a JSON object with "page", "page_number", "total_pages" and
+    "next_cursor". A result that fits is returned whole as its only page,
+    with "total_pages": 1 and a null cursor. Anything larger becomes the
+    first page and the rest is kept for next_page(). If the rest is too big
+    to keep, the first page is returned with "truncated": true and no cursor.
+
+    Strings are split into text chunks and lists into lists of items;
+    anything else (or a list with an item bigger than a page) is
+    JSON-encoded and split as text.
+
+    Args:
+        value: The tool result.
+        limit (int, optional): Page size in bytes. Defaults to MCP_RESULT_PAGE_BYTES.
+
+    Raises:
+        ValueError: If `limit` is too small to hold the envelope.
+    """
+    limit = check_page_bytes(limit or PAGE_BYTES)
+    single = _envelope(value, 1, 1, None)
+    if wire_size(single) <= limit:
+        return single
+
+    text = value if isinstance(value, str) else to_json(value)
+    pages = None
+    if isinstance(value, list):
+        pages = split_list(value, _page_budget([], limit))
+    if pages is None:
+        pages = split_text(text, _page_budget("", limit))
+
+    cursor = store.put(pages)
+    if cursor is None:
+        return _envelope(pages[0], 1, len(pages), None, truncated=True)
+    return _envelope(pages[0], 1, len(pages), cursor)
+
+
+def register_next_page(mcp):
+    """
+    Adds the next_page tool to a FastMCP server.
+    """
+
+    @mcp.tool(structured_output=False)
+    def next_page(cursor: str) -> str:
+        """
+        Fetches the next page of a large result returned by another tool.
+
+        Args:
+            cursor (str): The next_cursor value from the previous page.
+
+        Returns:
+            str: JSON with the page content, its page_number, total_pages and
+                 the next_cursor (null on the last page), or an error message.
+        """
+        return store.get(cursor)
+
+    return next_page
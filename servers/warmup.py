@@ -0,0 +1,326 @@
+# Background warm-up of the CSV and PDF caches for the document servers
+#
+# When MCP_WARM_DIRS is set (directories separated by os.pathsep), a
+# low-priority background thread polls those directories for .csv and .pdf
+# files and parses them ahead of time: CSVs into a DataFrame indexed by row,
+# PDFs into the extracted text of every page. read_csv and read_pdf then
+# answer from the cache instead of re-parsing the file, as long as the file
+# has not changed since it was warmed.
+#
+# The worker only does a small unit of work at a time (a chunk of CSV rows
+# or one PDF page), and pauses whenever a live tool call is running.
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import fitz
+import pandas as pd
+
+WARM_DIRS = [d for d in os.environ.get("MCP_WARM_DIRS", "").split(os.pathsep) if d]
+POLL_INTERVAL = float(os.environ.get("MCP_WARM_POLL_INTERVAL", 5))
+THROTTLE = float(os.environ.get("MCP_WARM_THROTTLE", 0.005))
+MAX_CACHED_FILES = int(os.environ.get("MCP_WARM_MAX_FILES", 16))
+MAX_CACHED_BYTES = int(os.environ.get("MCP_WARM_MAX_BYTES", 512 * 1024 * 1024))
+CSV_CHUNK_ROWS = int(os.environ.get("MCP_WARM_CSV_CHUNK_ROWS", 20_000))
+
+WARMABLE_EXTENSIONS = {".csv": "csv", ".pdf": "pdf"}
+
+
+def file_signature(path: str):
+    """
+    Returns (mtime_ns, size) for a file, or None if it no longer exists.
+    A cache entry is fresh only while this still matches.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def data_size(kind: str, data) -> int:
+    """Approximate in-memory bytes of a warmed CSV DataFrame or list of page texts."""
+    if kind == "csv":
+        return int(data.memory_usage(deep=True).sum())
+    return sum(sys.getsizeof(text) for text in data)
+
+
+class _TooLarge(Exception):
+    """Raised mid-parse once a file's warmed data would exceed the cache budget."""
+
+
+class DocumentCache:
+    """
+    Parsed documents keyed by absolute path, evicted least recently used
+    first to stay within `max_files` files and `max_bytes` bytes.
+    """
+
+    def __init__(self, max_files: int, max_bytes: int):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> {"kind", "signature", "data", "size", "warmed_at"}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, kind: str):
+        """Returns the cached data if it exists and the file is unchanged, else None."""
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["kind"] != kind:
+                return None
+            if entry["signature"] != file_signature(path):
+                return None
+            self._entries.move_to_end(path)
+            return entry["data"]
+
+    def put(self, path: str, kind: str, signature, data, size: int) -> bool:
+        """
+        Caches a parsed file, evicting the least recently used files first
+        to make room. Returns False if the file alone exceeds the byte budget.
+        """
+        if self.max_files < 1 or size > self.max_bytes:
+            self.discard(path)
+            return False
+
+        with self._lock:
+            self._pop(path)
+            while self._entries and (len(self._entries) + 1 > self.max_files or self._bytes + size > self.max_bytes):
+                self._pop(next(iter(self._entries)))
+            self._entries[path] = {"kind": kind, "signature": signature, "data": data, "size": size, "warmed_at": time.time()}
+            self._bytes += size
+        return True
+
+    def _pop(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    def discard(self, path: str):
+        with self._lock:
+            self._pop(path)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def describe(self) -> list:
+        """Freshness of every cached file, for the status resource."""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        files = []
+        for path, entry in entries:
+            files.append({
+                "path": path,
+                "kind": entry["kind"],
+                "rows" if entry["kind"] == "csv" else "pages": len(entry["data"]),
+                "bytes": entry["size"],
+                "warmed_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(entry["warmed_at"])),
+                "fresh": entry["signature"] == file_signature(path),
+            })
+        return files
+
+
+class Warmer:
+    """
+    Polls the watched directories by mtime and warms new or changed files
+    on a background thread, yielding to live tool calls.
+    """
+
+    def __init__(self, dirs: list, cache: DocumentCache, poll_interval: float, throttle: float):
+        self.dirs = [os.path.abspath(d) for d in dirs]
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.throttle = throttle
+
+        self._live_calls = 0
+        self._idle = threading.Condition()
+        self._thread = None
+
+        # Signature each file had when the worker last processed it, whether or
+        # not the result is still cached. Files are only re-warmed when this
+        # changes, so files evicted from a full cache are not parsed again.
+        self.processed = {}
+        self.too_large = set()
+
+        self.queue = []
+        self.current = None
+        self.last_scan = None
+        self.errors = {}
+
+    @contextmanager
+    def live_call(self):
+        """Marks a tool call in progress; the worker pauses until it ends."""
+        with self._idle:
+            self._live_calls += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._live_calls -= 1
+                if self._live_calls == 0:
+                    self._idle.notify_all()
+
+    def _yield_to_live_calls(self):
+        with self._idle:
+            self._idle.wait_for(lambda: self._live_calls == 0)
+        time.sleep(self.throttle)
+
+    def start(self):
+        if self._thread is None and self.dirs:
+            self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # Best effort: lower this thread's CPU priority (Linux applies it per thread)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+        while True:
+            self._scan()
+            while self.queue:
+                path, kind, signature = self.queue.pop(0)
+                self._warm(path, kind, signature)
+            time.sleep(self.poll_interval)
+
+    def _scan(self):
+        """Queues every watched file that is new or changed since it was last processed."""
+        queue = []
+        present = set()
+        for directory in self.dirs:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    kind = WARMABLE_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+                    if kind is None:
+                        continue
+                    path = os.path.join(root, name)
+                    present.add(path)
+                    signature = file_signature(path)
+                    if signature is not None and signature != self.processed.get(path):
+                        queue.append((path, kind, signature))
+
+        # Forget files that were deleted
+        for path in set(self.processed) - present:
+            self.processed.pop(path, None)
+            self.too_large.discard(path)
+            self.errors.pop(path, None)
+            self.cache.discard(path)
+
+        self.queue = queue
+        self.last_scan = time.time()
+
+    def _warm(self, path: str, kind: str, signature):
+        self.current = {"path": path, "kind": kind, "done": 0, "bytes": 0}
+        try:
+            if kind == "csv":
+                data = self._warm_csv(path)
+            else:
+                data = self._warm_pdf(path)
+            # Only keep the result if the file did not change while we parsed it;
+            # otherwise the next scan sees the new signature and warms it again
+            if file_signature(path) != signature:
+                return
+            if self.cache.put(path, kind, signature, data, data_size(kind, data)):
+                self.too_large.discard(path)
+            else:
+                self.too_large.add(path)
+            self.errors.pop(path, None)
+        except _TooLarge:
+            self.cache.discard(path)
+            self.too_large.add(path)
+            self.errors.pop(path, None)
+        except Exception as e:
+            self.cache.discard(path)
+            self.errors[path] = str(e)
+        finally:
+            # Failed files are not retried until they change either
+            if file_signature(path) == signature:
+                self.processed[path] = signature
+            self.current = None
+
+    def _count_bytes(self, size: int):
+        """Adds to the running size of the file being warmed and gives up once it cannot be cached."""
+        self.current["bytes"] += size
+        if self.current["bytes"] > self.cache.max_bytes:
+            raise _TooLarge()
+
+    def _warm_csv(self, path: str):
+        # The budget is checked per chunk, so an oversized file is abandoned
+        # after at most max_bytes plus one chunk rather than after a full parse
+        chunks = []
+        with pd.read_csv(path, chunksize=CSV_CHUNK_ROWS) as reader:
+            for chunk in reader:
+                chunks.append(chunk)
+                self.current["done"] += len(chunk)
+                self._count_bytes(int(chunk.memory_usage(deep=True).sum()))
+                self._yield_to_live_calls()
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(path)
+
+    def _warm_pdf(self, path: str):
+        pages = []
+        with fitz.open(path) as doc:
+            self.current["total"] = len(doc)
+            for page in doc:
+                text = page.get_text()
+                pages.append(text)
+                self.current["done"] += 1
+                self._count_bytes(sys.getsizeof(text))
+                self._yield_to_live_calls()
+        return pages
+
+    def status(self) -> dict:
+        # Read once: the worker thread may reset it to None in between
+        current = self.current
+        current = dict(current) if current else None
+        return {
+            "enabled": bool(self.dirs),
+            "watched_dirs": self.dirs,
+            "poll_interval": self.poll_interval,
+            "last_scan": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.last_scan)) if self.last_scan else None,
+            "warming": current,
+            "queued": [path for path, _, _ in self.queue],
+            "cached": self.cache.describe(),
+            "cached_bytes": self.cache.total_bytes,
+            "max_bytes": self.cache.max_bytes,
+            "too_large": sorted(self.too_large),
+            "errors": dict(self.errors),
+        }
+
+
+cache = DocumentCache(MAX_CACHED_FILES, MAX_CACHED_BYTES)
+warmer = Warmer(WARM_DIRS, cache, POLL_INTERVAL, THROTTLE)
+live_call = warmer.live_call
+
+
+def cached_csv(file_path: str):
+    """The warmed DataFrame for a CSV file, or None if it is not cached or stale."""
+    return cache.get(file_path, "csv")
+
+
+def cached_pdf_pages(file_path: str):
+    """The warmed per-page text of a PDF file, or None if it is not cached or stale."""
+    return cache.get(file_path, "pdf")
+
+
+def register_warmup(mcp):
+    """
+    Adds the warmup://status resource to a FastMCP server and starts the
+    background worker if MCP_WARM_DIRS is set.
+    """
+
+    @mcp.resource("warmup://status", title="Cache Warm-up Status")
+    def warmup_status() -> dict:
+        """
+        Returns the watched directories, the file being warmed, the queue,
+        and every cached file with whether it is still fresh.
+        """
+        return warmer.status()
+
+    warmer.start()
+    return warmup_status
@@ -0,0 +1,109 @@
+# Checks the clients' streaming path against a scripted local Gemini stream
+import asyncio
+import os
+import sys
+
+from google import genai
+from google.genai import types
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.types import CallToolResult, TextContent
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "clients"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+
+from fake_gemini import start_fake_gemini
+from streaming import run_streaming_turn
+
+# Text, then a tool call, then more text that takes a while to arrive
+SCRIPT = [
+    {"parts": [{"text": "Adding the numbers. "}]},
+    {"parts": [{"functionCall": {"name": "add", "args": {"a": 2, "b": 3}}}], "delay": 0.2},
+    {"parts": [{"text": "Still "}], "delay": 0.5},
+    {"parts": [{"text": "streaming."}], "delay": 0.5},
+]
+
+
+def fake_client(server) -> genai.Client:
+    return genai.Client(
+        api_key="test",
+        http_options=types.HttpOptions(base_url=f"http://127.0.0.1:{server.server_address[1]}"),
+    )
+
+
+def test_tool_result_arrives_before_stream_ends():
+    server = start_fake_gemini(script=SCRIPT)
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(REPO_ROOT, "servers", "server_new.py")],
+    )
+
+    async def run():
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(server_params, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    return await run_streaming_turn(
+                        fake_client(server),
+                        session,
+                        model="gemini-2.5-flash",
+                        contents="What is 2 + 3?",
+                        config=types.GenerateContentConfig(),
+                    )
+
+    try:
+        results, metrics = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert len(results) == 1
+    tool_name, result = results[0]
+    assert tool_name == "add"
+    assert result.content[0].text == "5"
+
+    assert metrics["time_to_first_token"] < metrics["time_to_first_tool_call"]
+    assert metrics["time_to_first_tool_call"] <= metrics["time_to_first_tool_result"]
+    assert metrics["time_to_first_tool_result"] < metrics["time_to_stream_end"]
+    assert metrics["time_to_stream_end"] <= metrics["total"]
+
+
+def test_failed_tool_call_does_not_abort_turn():
+    script = [
+        {"parts": [{"functionCall": {"name": "broken", "args": {}}}]},
+        {"parts": [{"functionCall": {"name": "slow", "args": {}}}]},
+        {"parts": [{"text": "Done."}], "delay": 0.1},
+    ]
+    server = start_fake_gemini(script=script)
+
+    class StubSession:
+        def __init__(self):
+            self.finished = []
+
+        async def call_tool(self, name, arguments=None):
+            if name == "broken":
+                raise RuntimeError("tool blew up")
+            await asyncio.sleep(0.3)
+            self.finished.append(name)
+            return CallToolResult(content=[TextContent(type="text", text=f"{name} ok")])
+
+    session = StubSession()
+    try:
+        results, metrics = asyncio.run(run_streaming_turn(
+            fake_client(server),
+            session,
+            model="gemini-2.5-flash",
+            contents="Run both tools.",
+            config=types.GenerateContentConfig(),
+        ))
+    finally:
+        server.shutdown()
+
+    assert [name for name, _ in results] == ["broken", "slow"]
+    assert isinstance(results[0][1], RuntimeError)
+    assert results[1][1].content[0].text == "slow ok"
+    assert session.finished == ["slow"]
+    # The stream opened with a function call, which counts as the first token
+    assert metrics["time_to_first_token"] is not None
+    assert metrics["time_to_first_token"] <= metrics["time_to_first_tool_call"]
+    assert metrics["total"] is not None